@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
 from datetime import date
 from io import BytesIO
 import os
+import re
+import sqlite3
 
 # ----------------- PAGE CONFIG -----------------
 st.set_page_config(page_title="Solar POD Dashboard", layout="wide")
@@ -17,20 +21,49 @@ default_date = date.today()
 st.sidebar.markdown("### 📅 Select POD Date")
 selected_date = st.sidebar.date_input("Choose POD Date", value=default_date)
 TODAY = selected_date.strftime("%Y-%m-%d")
-FILE_PATH = os.path.join(DATA_DIR, f"POD_{TODAY}.xlsx")
+FILE_PATH = os.path.join(DATA_DIR, f"POD_{TODAY}.sqlite")
+XLSX_PATH = os.path.join(DATA_DIR, f"POD_{TODAY}.xlsx")  # pre-SQLite saves, imported on first open
 
 # ----------------- EMPLOYEE MASTER LIST -----------------
-EMPLOYEES = [
+EMPLOYEES = (
     "Kishan","Narendra","Roop Singh","Dinesh","Devisingh","Kanaram","Laxman",
     "Suresh","Ajay","Narpat","Mahipal","Santosh","Vikram","Navratan",
     "Rajendra","Gotam","Sawai","Hemant"
-]
+)
+
+# ----------------- SHIFTS & STATUS CATEGORIES -----------------
+shifts = ("Shift A (06:30-15:00)", "General Shift (09:00-18:00)", "Shift B (13:00-21:00)", "Shift C (21:00-06:00)")
+eod_types = ("Activity", "Alert")
+eod_statuses = ("✅ Completed", "❌ Pending", "✅ Resolved")
+# columns stored as categoricals; "✅ N Resolved" statuses are added as extra categories
+CATEGORY_COLUMNS = {"Shift": shifts, "Type": eod_types, "Status": eod_statuses}
+
+# ----------------- HEADER & FOOTER MARKUP -----------------
+HEADER_HTML = """
+    <div style="background:linear-gradient(90deg, #EFEF36, #f44336);padding:15px;border-radius:10px;text-align:center;">
+        <h1 style="color:white;margin:0;">☀️ JUNA Plan of Day Dashboard</h1>
+        <h3 style="color:white;margin:0;">{display_date}</h3>
+    </div>
+"""
+FOOTER_HTML = "<div style='text-align:center;color:gray;'>⚡ Designed by Acciona for Solar Plant Daily Operations</div>"
 
 # ----------------- DEFAULT DATAFRAMES -----------------
-default_manpower = pd.DataFrame(columns=["Shift", "No. of Persons", "Employees"])
-default_activities = pd.DataFrame(columns=["Activity", "Location", "Shift", "No. of Persons", "Employees"])
-default_alerts = pd.DataFrame(columns=["Alert Activity", "Alert Count", "Rectified Count", "Alert Balance"])
-default_eod = pd.DataFrame(columns=["Type", "Name", "Status", "Remarks", "Resolved Count", "Alert Count Balance"])
+# typed up front so the first append and the KPI sums stay on int64/str blocks; load_pod_data makes the categoricals
+TEXT = pd.Series(dtype="str")
+COUNT = pd.Series(dtype="int64")
+default_manpower = pd.DataFrame({"Shift": TEXT, "No. of Persons": COUNT, "Employees": TEXT})
+default_activities = pd.DataFrame({"Activity": TEXT, "Location": TEXT, "Shift": TEXT, "No. of Persons": COUNT, "Employees": TEXT})
+default_alerts = pd.DataFrame({"Alert Activity": TEXT, "Alert Count": COUNT, "Rectified Count": COUNT, "Alert Balance": COUNT})
+default_eod = pd.DataFrame({"Type": TEXT, "Name": TEXT, "Status": TEXT, "Remarks": TEXT, "Resolved Count": COUNT, "Alert Count Balance": COUNT})
+
+# ----------------- SQLITE WORKING STORE -----------------
+# One table per sheet, named after its session_state key. XLSX is only built for download.
+TABLE_SCHEMAS = {
+    "manpower": {"Shift": "TEXT", "No. of Persons": "INTEGER", "Employees": "TEXT"},
+    "activities": {"Activity": "TEXT", "Location": "TEXT", "Shift": "TEXT", "No. of Persons": "INTEGER", "Employees": "TEXT"},
+    "alerts": {"Alert Activity": "TEXT", "Alert Count": "INTEGER", "Rectified Count": "INTEGER", "Alert Balance": "INTEGER"},
+    "eod": {"Type": "TEXT", "Name": "TEXT", "Status": "TEXT", "Remarks": "TEXT", "Resolved Count": "INTEGER", "Alert Count Balance": "INTEGER"},
+}
 
 # ----------------- HELPERS -----------------
 def ensure_columns(df: pd.DataFrame, cols_with_defaults: dict):
@@ -46,68 +79,280 @@ def to_numeric_safe(df: pd.DataFrame, cols):
             df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
     return df
 
+def to_categorical(df: pd.DataFrame):
+    """Cast the CATEGORY_COLUMNS present in df to categoricals. Re-apply after .loc appends, which drop the dtype."""
+    for col, known in CATEGORY_COLUMNS.items():
+        if col in df.columns:
+            extra = [v for v in df[col].dropna().unique() if v not in known]
+            df[col] = df[col].astype(pd.CategoricalDtype([*known, *extra]))
+    return df
+
+# one comma-separated name with surrounding whitespace trimmed; blank entries never match
+_EMP_RE = re.compile(r"[^,\s][^,]*[^,\s]|[^,\s]")
+
+def join_employees(selected, extra):
+    """Selected names plus the comma-separated extras as one 'A, B, C' string, stripped and de-duplicated."""
+    return ", ".join(dict.fromkeys([*selected, *_EMP_RE.findall(extra)]))
+
+SHEET_NAMES = ["Manpower", "Activities", "Alerts", "EOD"]
+
+def read_workbook(path):
+    """Read SHEET_NAMES into {name: DataFrame} with calamine, or openpyxl read-only if it isn't installed."""
+    try:
+        return pd.read_excel(path, sheet_name=SHEET_NAMES, engine="calamine")
+    except ImportError:
+        pass
+    from openpyxl import load_workbook
+
+    # read_only streams rows instead of materialising every cell of the workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for name in SHEET_NAMES:
+            rows = wb[name].values
+            sheets[name] = pd.DataFrame(rows, columns=next(rows, None))
+        return sheets
+    finally:
+        wb.close()
+
 def load_excel_data(path):
     try:
-        with pd.ExcelFile(path) as xls:
-            manpower = pd.read_excel(xls, "Manpower")
-            activities = pd.read_excel(xls, "Activities")
-            alerts = pd.read_excel(xls, "Alerts")
-            eod = pd.read_excel(xls, "EOD")
-        return manpower, activities, alerts, eod
+        sheets = read_workbook(path)
+        return sheets["Manpower"], sheets["Activities"], sheets["Alerts"], sheets["EOD"]
     except Exception:
         return default_manpower.copy(), default_activities.copy(), default_alerts.copy(), default_eod.copy()
 
-def save_data():
-    with pd.ExcelWriter(FILE_PATH, engine="openpyxl") as writer:
-        st.session_state.manpower.to_excel(writer, sheet_name="Manpower", index=False)
-        st.session_state.activities.to_excel(writer, sheet_name="Activities", index=False)
-        st.session_state.alerts.to_excel(writer, sheet_name="Alerts", index=False)
-        st.session_state.eod.to_excel(writer, sheet_name="EOD", index=False)
+def load_db_data(path):
+    try:
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            return tuple(pd.read_sql(f"SELECT * FROM {table}", conn) for table in TABLE_SCHEMAS)
+    except Exception:
+        return default_manpower.copy(), default_activities.copy(), default_alerts.copy(), default_eod.copy()
 
-# ----------------- LOAD OR INIT SESSION STATE -----------------
-if os.path.exists(FILE_PATH):
-    mp, act, alr, eod = load_excel_data(FILE_PATH)
+def load_pod_data(path):
+    """Load the four POD tables from a .sqlite store or a legacy .xlsx workbook."""
+    mp, act, alr, eod = load_excel_data(path) if path.endswith(".xlsx") else load_db_data(path)
     # Ensure columns exist (backwards compatible)
     alr = ensure_columns(alr, {"Alert Activity": "", "Alert Count": 0, "Rectified Count": 0, "Alert Balance": 0})
     alr = to_numeric_safe(alr, ["Alert Count", "Rectified Count", "Alert Balance"])
+    # keep the EOD lookup key a typed string column, even when the sheet is empty or all-missing
+    alr["Alert Activity"] = alr["Alert Activity"].astype("str")
     eod = ensure_columns(eod, {"Type": "", "Name": "", "Status": "", "Remarks": "", "Resolved Count": 0, "Alert Count Balance": 0})
     eod = to_numeric_safe(eod, ["Resolved Count", "Alert Count Balance"])
+    return to_categorical(mp), to_categorical(act), alr, to_categorical(eod)
+
+# every write makes a new file version, so keep only the latest few instead of one entry per write
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_pod(path: str, mtime: float):
+    """load_pod_data cached per file version; mtime only takes part in the cache key."""
+    return load_pod_data(path)
+
+def _mtime(path):
+    """Modification time of path, or None if it can't be stat'ed; one syscall for both existence and cache key."""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_pod_files(folder: str) -> list:
+    """POD files in folder, newest date first. Cleared by get_connection when it creates a new date's file."""
+    folder_files = set(os.listdir(folder))
+    # Workbooks from before the SQLite store are listed until that date has been reopened
+    return sorted((
+        f for f in folder_files
+        if f.startswith("POD_") and (f.endswith(".sqlite") or (f.endswith(".xlsx") and f[:-5] + ".sqlite" not in folder_files))
+    ), reverse=True)
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _insert_sql(table):
+    return f"INSERT INTO {table} VALUES ({', '.join('?' * len(TABLE_SCHEMAS[table]))})"
+
+def get_connection():
+    """Return this session's connection to FILE_PATH, creating the tables on first use."""
+    if st.session_state.get("db_path") != FILE_PATH:
+        if "db" in st.session_state:
+            st.session_state.db.close()
+        is_new_file = not os.path.exists(FILE_PATH)
+        conn = sqlite3.connect(FILE_PATH, isolation_level=None, check_same_thread=False)
+        for table, cols in TABLE_SCHEMAS.items():
+            col_defs = ", ".join(f"{_quote(c)} {t}" for c, t in cols.items())
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({col_defs})")
+        st.session_state.db = conn
+        st.session_state.db_path = FILE_PATH
+        if is_new_file:
+            _list_pod_files.clear()
+    return st.session_state.db
+
+def mark_synced():
+    """Record FILE_PATH's mtime after this session's own write, so only other sessions' writes trigger a reload."""
+    st.session_state.loaded_mtime = _mtime(FILE_PATH)
+
+@contextmanager
+def transaction():
+    """Group the writes inside the block into a single BEGIN ... COMMIT."""
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN")
+        yield
+    mark_synced()
+
+def insert_row(table, row):
+    get_connection().execute(_insert_sql(table), [row.get(c) for c in TABLE_SCHEMAS[table]])
+    mark_synced()
+
+def write_table(table):
+    """Replace the contents of `table` with st.session_state[table]."""
+    rows = st.session_state[table].reindex(columns=list(TABLE_SCHEMAS[table])).astype(object)
+    rows = rows.where(rows.notna(), None).values.tolist()
+    conn = get_connection()
+    conn.execute(f"DELETE FROM {table}")
+    conn.executemany(_insert_sql(table), rows)
+
+def undo_last(table):
+    """Invert the newest entry on the table's undo stack: drop the appended row or re-insert the deleted one."""
+    action = st.session_state.undo_stack[table].pop()
+    df = st.session_state[table]
+    if action[0] == "add":
+        df = df.iloc[:-1]
+    else:
+        _, pos, row = action
+        df = pd.concat([df.iloc[:pos], pd.DataFrame([row]), df.iloc[pos:]], ignore_index=True)
+    st.session_state[table] = to_categorical(df)
+
+def update_alert_counts(pos, rectified, balance):
+    """Update the alerts row at frame position `pos`; rowid order is the session frame's row order."""
+    # by position rather than name, so it hits the same row as the frame even when the name is missing
+    get_connection().execute(
+        'UPDATE alerts SET "Rectified Count" = ?, "Alert Balance" = ? '
+        'WHERE rowid = (SELECT rowid FROM alerts ORDER BY rowid LIMIT 1 OFFSET ?)',
+        (rectified, balance, pos),
+    )
+
+def save_data(*tables):
+    """Rewrite the given tables (all four by default). Appends should use insert_row instead."""
+    with transaction():
+        for table in tables or TABLE_SCHEMAS:
+            write_table(table)
+
+def fast_to_xlsx(dfs: dict, out):
+    """Write {sheet name: DataFrame} row by row with xlsxwriter in constant_memory mode."""
+    # constant_memory flushes each row once the next one starts, so rows must go out in order;
+    # DataFrame.to_excel writes column by column and would lose cells in this mode.
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(out, {"constant_memory": True})
+    for sheet_name, df in dfs.items():
+        ws = wb.add_worksheet(sheet_name)
+        ws.write_row(0, 0, list(df.columns))
+        rows = df.astype(object)
+        for r, row in enumerate(rows.where(rows.notna(), None).itertuples(index=False, name=None), start=1):
+            ws.write_row(r, 0, row)
+    wb.close()
+
+def build_download_bytes(sheets: dict):
+    """Serialize {sheet name: DataFrame} to XLSX bytes. Runs on the download executor thread."""
+    output = BytesIO()
+    fast_to_xlsx(sheets, output)
+    return output.getvalue()
+
+ALERT_CHART_COLUMNS = ["Alert Activity", "Alert Count", "Rectified Count", "Alert Balance"]
+
+def _df_hash(df: pd.DataFrame) -> bytes:
+    """Cache key for a DataFrame argument: vectorised row hashes instead of hashing cell by cell."""
+    return pd.util.hash_pandas_object(df, index=True).values.tobytes()
+
+# each distinct alerts state is a new key; only the recent ones are worth keeping
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _df_hash}, max_entries=16)
+def alerts_figure(alert_df: pd.DataFrame) -> dict:
+    """Figure dict for the alert status chart, cached on the ALERT_CHART_COLUMNS of the alerts table."""
+    import plotly.express as px
+
+    # For display order, reverse so largest on top (optional)
+    alert_df = alert_df.sort_values("Alert Count", ascending=False)
+
+    # Build horizontal stacked bar chart with px (colors set)
+    fig = px.bar(
+        alert_df,
+        y="Alert Activity",
+        x=["Rectified Count", "Alert Balance"],
+        orientation="h",
+        text_auto=True,
+        barmode="stack",
+        labels={"value":"Count", "Alert Activity":"Alert Activity"},
+        color_discrete_map={"Rectified Count":"green", "Alert Balance":"red"}
+    )
+    fig.update_layout(
+        title="Alert Status Overview (Rectified vs Pending)",
+        xaxis_title="Count",
+        yaxis_title="Alert Activity",
+        legend_title="Status",
+        height=500,
+    )
+    return fig.to_dict()
+
+@st.fragment(run_every=1)
+def wait_for_download():
+    """Poll the background XLSX build and rerun the page once it has finished."""
+    dl_future = st.session_state.get("dl_future")
+    if dl_future is None or dl_future.done():
+        st.rerun()
+    st.info("⏳ Preparing POD file...")
+
+# ----------------- UNDO STACK -----------------
+# Entries are ("add",) or ("del", position, row_dict), not frame copies; the oldest fall off past UNDO_DEPTH.
+# They only make sense against the frame they were pushed on, so they are cleared whenever a frame is replaced.
+UNDO_DEPTH = 20
+if "undo_stack" not in st.session_state:
+    st.session_state.undo_stack = {"manpower": deque(maxlen=UNDO_DEPTH), "activities": deque(maxlen=UNDO_DEPTH)}
+
+# ----------------- LOAD OR INIT SESSION STATE -----------------
+# Session state is the working copy and every change is written through to FILE_PATH, so the store
+# is only read when the session first sees this date or another session has written to it since.
+db_mtime = _mtime(FILE_PATH)
+if st.session_state.get("loaded_path") != FILE_PATH or st.session_state.get("loaded_mtime") != db_mtime:
+    xlsx_mtime = _mtime(XLSX_PATH) if db_mtime is None else None
+    migrate_xlsx = xlsx_mtime is not None
+    load_path, mtime = (XLSX_PATH, xlsx_mtime) if migrate_xlsx else (FILE_PATH, db_mtime)
+    if mtime is not None:
+        mp, act, alr, eod = _load_pod(load_path, mtime)
+    else:
+        mp, act, alr, eod = load_pod_data(load_path)  # nothing saved yet: defaults
     st.session_state.manpower = mp
     st.session_state.activities = act
     st.session_state.alerts = alr
     st.session_state.eod = eod
-else:
-    st.session_state.manpower = default_manpower.copy()
-    st.session_state.activities = default_activities.copy()
-    st.session_state.alerts = default_alerts.copy()
-    st.session_state.eod = default_eod.copy()
-
-# ----------------- UNDO STACK -----------------
-if "undo_stack" not in st.session_state:
-    st.session_state.undo_stack = {"manpower": [], "activities": []}
+    st.session_state.loaded_path = FILE_PATH
+    st.session_state.loaded_mtime = db_mtime
+    for stack in st.session_state.undo_stack.values():
+        stack.clear()
+    if migrate_xlsx:
+        save_data()
 
 # ----------------- POD DATA FOLDER (for manual load) -----------------
 folder = DATA_DIR
 os.makedirs(folder, exist_ok=True)
 
 st.sidebar.subheader("📂 Load Previous POD Data")
-pod_files = [f for f in os.listdir(folder) if f.startswith("POD_") and f.endswith(".xlsx")]
-pod_files.sort(reverse=True)
+pod_files = _list_pod_files(folder)
 
 if pod_files:
     selected_file = st.sidebar.selectbox("Select a date to load", pod_files)
-    if st.sidebar.button("Load Selected Data"):
+    # loading copies the chosen day over this date's store, so it has to be asked for explicitly
+    confirm_load = st.sidebar.checkbox(f"Replace all {TODAY} entries with the selected day")
+    if st.sidebar.button("Load Selected Data", disabled=not confirm_load):
         file_path = os.path.join(folder, selected_file)
-        mp, act, alr, eod = load_excel_data(file_path)
-        alr = ensure_columns(alr, {"Alert Activity": "", "Alert Count": 0, "Rectified Count": 0, "Alert Balance": 0})
-        alr = to_numeric_safe(alr, ["Alert Count", "Rectified Count", "Alert Balance"])
-        eod = ensure_columns(eod, {"Type": "", "Name": "", "Status": "", "Remarks": "", "Resolved Count": 0, "Alert Count Balance": 0})
-        eod = to_numeric_safe(eod, ["Resolved Count", "Alert Count Balance"])
+        mp, act, alr, eod = load_pod_data(file_path)
         st.session_state.manpower = mp
         st.session_state.activities = act
         st.session_state.alerts = alr
         st.session_state.eod = eod
-        st.sidebar.success(f"✅ Data loaded from {selected_file}")
+        for stack in st.session_state.undo_stack.values():
+            stack.clear()
+        save_data()
+        st.sidebar.success(f"✅ Data loaded from {selected_file} into {TODAY}")
 else:
     st.sidebar.info("No POD data saved yet.")
 
@@ -116,33 +361,39 @@ st.sidebar.title("⚙️ POD Input Panel")
 
 # ---- SHIFT MANPOWER ENTRY ----
 st.sidebar.subheader("👷 Add Manpower (Shift-wise)")
-shifts = ["Shift A (06:30-15:00)", "General Shift (09:00-18:00)", "Shift B (13:00-21:00)", "Shift C (21:00-06:00)"]
 shift = st.sidebar.selectbox("Select Shift", shifts)
 manpower_count = st.sidebar.number_input("Number of Persons", min_value=0, step=1)
 emp_selected = st.sidebar.multiselect("Select Employees", EMPLOYEES)
 emp_custom = st.sidebar.text_input("Other Names (comma separated)")
-final_employees = emp_selected + ([x.strip() for x in emp_custom.split(",")] if emp_custom else [])
+final_employees = join_employees(emp_selected, emp_custom)
 
 if st.sidebar.button("➕ Add Manpower"):
-    new_row = {"Shift": shift, "No. of Persons": manpower_count, "Employees": ", ".join(final_employees)}
+    new_row = {"Shift": shift, "No. of Persons": manpower_count, "Employees": final_employees}
     # push to undo stack
-    st.session_state.undo_stack["manpower"].append(st.session_state.manpower.copy())
-    st.session_state.manpower = pd.concat([st.session_state.manpower, pd.DataFrame([new_row])], ignore_index=True)
-    save_data()
+    st.session_state.undo_stack["manpower"].append(("add",))
+    st.session_state.manpower.loc[len(st.session_state.manpower)] = new_row
+    st.session_state.manpower = to_categorical(st.session_state.manpower)
+    insert_row("manpower", new_row)
     st.sidebar.success("Manpower entry added!")
 
 # ---- DELETE MANPOWER ENTRY ----
 if not st.session_state.manpower.empty:
     st.sidebar.subheader("🗑️ Delete Manpower Entry")
-    manpower_idx = st.sidebar.selectbox(
+    # build every option label in one vectorised pass; the selectbox works on row positions.
+    # fillna after astype: blank cells stay NaN under pandas' str dtype, and a float label crashes the selectbox
+    manpower_labels = (
+        st.session_state.manpower["Shift"].astype(str).fillna("") + " - " + st.session_state.manpower["Employees"].astype(str).fillna("")
+    ).tolist()
+    manpower_pos = st.sidebar.selectbox(
         "Select entry", 
-        st.session_state.manpower.index,
-        format_func=lambda i: f"{st.session_state.manpower.at[i,'Shift']} - {st.session_state.manpower.at[i,'Employees']}"
+        range(len(manpower_labels)),
+        format_func=manpower_labels.__getitem__
     )
     if st.sidebar.button("❌ Delete Selected Entry"):
-        st.session_state.undo_stack["manpower"].append(st.session_state.manpower.copy())
-        st.session_state.manpower = st.session_state.manpower.drop(manpower_idx).reset_index(drop=True)
-        save_data()
+        removed = st.session_state.manpower.iloc[manpower_pos].to_dict()
+        st.session_state.undo_stack["manpower"].append(("del", manpower_pos, removed))
+        st.session_state.manpower = st.session_state.manpower.drop(st.session_state.manpower.index[manpower_pos]).reset_index(drop=True)
+        save_data("manpower")
         st.sidebar.success("Entry deleted!")
 
 # ---- ACTIVITY ENTRY ----
@@ -153,7 +404,7 @@ activity_shift = st.sidebar.selectbox("Assign Shift", shifts)
 activity_people = st.sidebar.number_input("No. of Persons Assigned", min_value=0, step=1)
 act_emp_selected = st.sidebar.multiselect("Select Employees for Activity", EMPLOYEES)
 act_emp_custom = st.sidebar.text_input("Other Names (comma separated for this activity)")
-final_act_employees = act_emp_selected + ([x.strip() for x in act_emp_custom.split(",")] if act_emp_custom else [])
+final_act_employees = join_employees(act_emp_selected, act_emp_custom)
 
 if st.sidebar.button("➕ Add Activity"):
     new_row = {
@@ -161,11 +412,12 @@ if st.sidebar.button("➕ Add Activity"):
         "Location": location,
         "Shift": activity_shift,
         "No. of Persons": activity_people,
-        "Employees": ", ".join(final_act_employees)
+        "Employees": final_act_employees
     }
-    st.session_state.undo_stack["activities"].append(st.session_state.activities.copy())
-    st.session_state.activities = pd.concat([st.session_state.activities, pd.DataFrame([new_row])], ignore_index=True)
-    save_data()
+    st.session_state.undo_stack["activities"].append(("add",))
+    st.session_state.activities.loc[len(st.session_state.activities)] = new_row
+    st.session_state.activities = to_categorical(st.session_state.activities)
+    insert_row("activities", new_row)
     st.sidebar.success("Activity entry added!")
 
 # ---- ALERT ENTRY ----
@@ -174,11 +426,9 @@ alert_name = st.sidebar.text_input("Alert Activity")
 alert_count = st.sidebar.number_input("Alert Count", min_value=0, max_value=100, step=1)
 if st.sidebar.button("➕ Add Alert"):
     new_row = {"Alert Activity": alert_name, "Alert Count": int(alert_count), "Rectified Count": 0, "Alert Balance": int(alert_count)}
-    # ensure columns exist then append
-    st.session_state.alerts = ensure_columns(st.session_state.alerts, {"Alert Activity": "", "Alert Count": 0, "Rectified Count": 0, "Alert Balance": 0})
-    st.session_state.alerts = pd.concat([st.session_state.alerts, pd.DataFrame([new_row])], ignore_index=True)
-    st.session_state.alerts = to_numeric_safe(st.session_state.alerts, ["Alert Count", "Rectified Count", "Alert Balance"])
-    save_data()
+    # columns are already int64 from load; appending ints keeps them that way
+    st.session_state.alerts.loc[len(st.session_state.alerts)] = new_row
+    insert_row("alerts", new_row)
     st.sidebar.success("Alert entry added!")
 
 # ---- EOD ENTRY ----
@@ -194,12 +444,13 @@ if eod_type == "Activity" and not st.session_state.activities.empty:
 
 elif eod_type == "Alert" and not st.session_state.alerts.empty:
     eod_name = st.sidebar.selectbox("Select Alert", st.session_state.alerts["Alert Activity"].tolist())
-    # ensure numeric columns exist
-    st.session_state.alerts = ensure_columns(st.session_state.alerts, {"Alert Activity": "", "Alert Count": 0, "Rectified Count": 0, "Alert Balance": 0})
-    st.session_state.alerts = to_numeric_safe(st.session_state.alerts, ["Alert Count", "Rectified Count", "Alert Balance"])
-
-    alert_total = int(st.session_state.alerts.loc[st.session_state.alerts["Alert Activity"]==eod_name, "Alert Count"].values[0])
-    alert_resolved_so_far = int(st.session_state.alerts.loc[st.session_state.alerts["Alert Activity"]==eod_name, "Rectified Count"].values[0])
+    # name -> row label, read bottom-up so a repeated name maps to its first row (the one the EOD update modifies);
+    # rebuilt every rerun so edits, undo and Load Previous can never leave it stale
+    alert_rows = st.session_state.alerts["Alert Activity"][::-1]
+    alert_index = dict(zip(alert_rows, alert_rows.index))
+    alert_i = alert_index.get(eod_name)
+    alert_total = int(st.session_state.alerts.at[alert_i, "Alert Count"]) if alert_i is not None else 0
+    alert_resolved_so_far = int(st.session_state.alerts.at[alert_i, "Rectified Count"]) if alert_i is not None else 0
     remaining_possible = max(alert_total - alert_resolved_so_far, 0)
 
     resolved_count = st.sidebar.number_input("Resolved Count (Today)", min_value=0, max_value=remaining_possible, step=1)
@@ -212,9 +463,8 @@ if eod_name:
     if st.sidebar.button("➕ Add EOD Update"):
         if eod_type == "Alert":
             # update the alerts table: add resolved_count cumulatively and update balance
-            idx = st.session_state.alerts[st.session_state.alerts["Alert Activity"]==eod_name].index
-            if len(idx) > 0:
-                i = idx[0]
+            i = alert_index.get(eod_name)
+            if i is not None:
                 prev_rect = int(st.session_state.alerts.at[i, "Rectified Count"]) if "Rectified Count" in st.session_state.alerts.columns else 0
                 prev_rect = max(prev_rect, 0)
                 add_rect = int(resolved_count) if resolved_count is not None else 0
@@ -223,6 +473,7 @@ if eod_name:
 
                 st.session_state.alerts.at[i, "Rectified Count"] = new_rect
                 st.session_state.alerts.at[i, "Alert Balance"] = new_balance
+                alert_pos = st.session_state.alerts.index.get_loc(i)
 
             new_row = {
                 "Type": "Alert",
@@ -233,7 +484,7 @@ if eod_name:
                 "Alert Count Balance": new_balance
             }
             st.session_state.eod = ensure_columns(st.session_state.eod, {"Type": "", "Name": "", "Status": "", "Remarks": "", "Resolved Count": 0, "Alert Count Balance": 0})
-            st.session_state.eod = pd.concat([st.session_state.eod, pd.DataFrame([new_row])], ignore_index=True)
+            st.session_state.eod.loc[len(st.session_state.eod)] = new_row
         else:
             # Activity EOD
             new_row = {
@@ -241,55 +492,53 @@ if eod_name:
                 "Name": eod_name,
                 "Status": eod_status,
                 "Remarks": eod_remarks,
-                "Resolved Count": "",
-                "Alert Count Balance": ""
+                "Resolved Count": 0,
+                "Alert Count Balance": 0
             }
-            st.session_state.eod = pd.concat([st.session_state.eod, pd.DataFrame([new_row])], ignore_index=True)
+            st.session_state.eod.loc[len(st.session_state.eod)] = new_row
 
         # coerce numeric columns to safe types
         st.session_state.alerts = ensure_columns(st.session_state.alerts, {"Rectified Count": 0, "Alert Balance": 0})
         st.session_state.alerts = to_numeric_safe(st.session_state.alerts, ["Alert Count", "Rectified Count", "Alert Balance"])
         st.session_state.eod = ensure_columns(st.session_state.eod, {"Resolved Count": 0, "Alert Count Balance": 0})
         st.session_state.eod = to_numeric_safe(st.session_state.eod, ["Resolved Count", "Alert Count Balance"])
-        save_data()
+        st.session_state.eod = to_categorical(st.session_state.eod)
+        with transaction():
+            if eod_type == "Alert":
+                update_alert_counts(alert_pos, new_rect, new_balance)
+            insert_row("eod", new_row)
         st.sidebar.success(f"EOD {eod_type} update added!")
 
 # ---- UNDO BUTTONS ----
 st.sidebar.subheader("↩️ Undo Last Action")
 if st.sidebar.button("Undo Last Manpower Action") and st.session_state.undo_stack["manpower"]:
-    st.session_state.manpower = st.session_state.undo_stack["manpower"].pop()
-    save_data()
+    undo_last("manpower")
+    save_data("manpower")
     st.sidebar.success("Undid last manpower change!")
 
 if st.sidebar.button("Undo Last Activity Action") and st.session_state.undo_stack["activities"]:
-    st.session_state.activities = st.session_state.undo_stack["activities"].pop()
-    save_data()
+    undo_last("activities")
+    save_data("activities")
     st.sidebar.success("Undid last activity change!")
 
 # ----------------- HEADER -----------------
 display_date = selected_date.strftime("%d-%m-%Y")
-st.markdown(f"""
-    <div style="background:linear-gradient(90deg, #EFEF36, #f44336);padding:15px;border-radius:10px;text-align:center;">
-        <h1 style="color:white;margin:0;">☀️ JUNA Plan of Day Dashboard</h1>
-        <h3 style="color:white;margin:0;">{display_date}</h3>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(HEADER_HTML.format(display_date=display_date), unsafe_allow_html=True)
 
 st.markdown("---")
 
 # ----------------- KPI CARDS -----------------
-# make sure alerts columns exist before summing
-st.session_state.alerts = ensure_columns(st.session_state.alerts, {"Alert Count": 0, "Rectified Count": 0, "Alert Balance": 0})
-st.session_state.alerts = to_numeric_safe(st.session_state.alerts, ["Alert Count", "Rectified Count", "Alert Balance"])
-
+# alert columns are coerced at load and after every edit, so they can be summed directly
 total_shifts = len(st.session_state.manpower)
 total_people = int(st.session_state.manpower["No. of Persons"].sum()) if not st.session_state.manpower.empty else 0
 total_activities = len(st.session_state.activities)
 total_alerts = int(st.session_state.alerts["Alert Count"].sum()) if not st.session_state.alerts.empty else 0
 
 eod_df = st.session_state.get("eod", pd.DataFrame(columns=["Type","Name","Status","Remarks","Resolved Count","Alert Count Balance"]))
-completed_activities = len(eod_df[(eod_df.get("Type")=="Activity") & (eod_df.get("Status")=="✅ Completed")])
-pending_activities = len(eod_df[(eod_df.get("Type")=="Activity") & (eod_df.get("Status")=="❌ Pending")])
+# one pass over the EOD log for both activity counts
+activity_status = eod_df.loc[eod_df["Type"].eq("Activity"), "Status"].value_counts()
+completed_activities = int(activity_status.get("✅ Completed", 0))
+pending_activities = int(activity_status.get("❌ Pending", 0))
 
 col1, col2, col3, col4, col5, col6 = st.columns(6)
 col1.metric("Total Shifts", total_shifts)
@@ -300,91 +549,115 @@ col5.metric("✅ Completed Activities", completed_activities)
 col6.metric("❌ Pending Activities", pending_activities)
 
 # ----------------- DATA EDITORS -----------------
-st.subheader("👷 Shift-wise Manpower Details")
-edited_manpower = st.data_editor(st.session_state.manpower, use_container_width=True, num_rows="dynamic")
-if st.button("💾 Save Manpower Changes"):
-    st.session_state.manpower = edited_manpower.copy()
-    save_data()
-    st.success("✅ Manpower updated!")
-
-st.subheader("📝 Planned Activities")
-edited_activities = st.data_editor(st.session_state.activities, use_container_width=True, num_rows="dynamic")
-if st.button("💾 Save Activity Changes"):
-    st.session_state.activities = edited_activities.copy()
-    save_data()
-    st.success("✅ Activities updated!")
-
-st.subheader("📊 End of Day Updates")
-edited_eod = st.data_editor(eod_df, use_container_width=True, num_rows="dynamic")
-if st.button("💾 Save EOD Changes"):
-    st.session_state.eod = edited_eod.copy()
-    # ensure numeric columns remain consistent
-    st.session_state.eod = ensure_columns(st.session_state.eod, {"Resolved Count": 0, "Alert Count Balance": 0})
-    st.session_state.eod = to_numeric_safe(st.session_state.eod, ["Resolved Count", "Alert Count Balance"])
-    save_data()
-    st.success("✅ EOD updated!")
-
-st.subheader("🚨 Alerts Overview (Editable)")
-edited_alerts = st.data_editor(st.session_state.alerts, use_container_width=True, num_rows="dynamic")
-if st.button("💾 Save Alerts Changes"):
-    st.session_state.alerts = edited_alerts.copy()
-    st.session_state.alerts = ensure_columns(st.session_state.alerts, {"Rectified Count": 0, "Alert Balance": 0})
-    st.session_state.alerts = to_numeric_safe(st.session_state.alerts, ["Alert Count", "Rectified Count", "Alert Balance"])
-    save_data()
-    st.success("✅ Alerts updated!")
+# One tab per table keeps the four editors out of one long scroll
+manpower_tab, activities_tab, eod_tab, alerts_tab = st.tabs(["👷 Manpower", "📝 Activities", "📊 EOD", "🚨 Alerts"])
+
+with manpower_tab:
+    st.subheader("👷 Shift-wise Manpower Details")
+    edited_manpower = st.data_editor(st.session_state.manpower, use_container_width=True, num_rows="dynamic")
+    if st.button("💾 Save Manpower Changes"):
+        if edited_manpower.equals(st.session_state.manpower):
+            st.info("No changes to save.")
+        else:
+            # keep a 0..n-1 index so .loc[len(df)] appends never overwrite a row
+            st.session_state.manpower = to_categorical(edited_manpower.reset_index(drop=True))
+            st.session_state.undo_stack["manpower"].clear()
+            save_data("manpower")
+            st.success("✅ Manpower updated!")
+
+with activities_tab:
+    st.subheader("📝 Planned Activities")
+    edited_activities = st.data_editor(st.session_state.activities, use_container_width=True, num_rows="dynamic")
+    if st.button("💾 Save Activity Changes"):
+        if edited_activities.equals(st.session_state.activities):
+            st.info("No changes to save.")
+        else:
+            st.session_state.activities = to_categorical(edited_activities.reset_index(drop=True))
+            st.session_state.undo_stack["activities"].clear()
+            save_data("activities")
+            st.success("✅ Activities updated!")
+
+with eod_tab:
+    st.subheader("📊 End of Day Updates")
+    edited_eod = st.data_editor(eod_df, use_container_width=True, num_rows="dynamic")
+    if st.button("💾 Save EOD Changes"):
+        if edited_eod.equals(eod_df):
+            st.info("No changes to save.")
+        else:
+            st.session_state.eod = to_categorical(edited_eod.reset_index(drop=True))
+            # ensure numeric columns remain consistent
+            st.session_state.eod = ensure_columns(st.session_state.eod, {"Resolved Count": 0, "Alert Count Balance": 0})
+            st.session_state.eod = to_numeric_safe(st.session_state.eod, ["Resolved Count", "Alert Count Balance"])
+            save_data("eod")
+            st.success("✅ EOD updated!")
+
+with alerts_tab:
+    st.subheader("🚨 Alerts Overview (Editable)")
+    edited_alerts = st.data_editor(st.session_state.alerts, use_container_width=True, num_rows="dynamic")
+    if st.button("💾 Save Alerts Changes"):
+        if edited_alerts.equals(st.session_state.alerts):
+            st.info("No changes to save.")
+        else:
+            st.session_state.alerts = edited_alerts.reset_index(drop=True)
+            st.session_state.alerts = ensure_columns(st.session_state.alerts, {"Rectified Count": 0, "Alert Balance": 0})
+            st.session_state.alerts = to_numeric_safe(st.session_state.alerts, ["Alert Count", "Rectified Count", "Alert Balance"])
+            save_data("alerts")
+            st.success("✅ Alerts updated!")
 
 # ----------------- ALERT CHART (HORIZONTAL STACKED) -----------------
 if not st.session_state.alerts.empty:
-    alert_df = st.session_state.alerts.copy()
-    alert_df = ensure_columns(alert_df, {"Alert Count": 0, "Rectified Count": 0, "Alert Balance": 0})
-    alert_df = to_numeric_safe(alert_df, ["Alert Count", "Rectified Count", "Alert Balance"])
+    # plotly is heavy to import; only pay for it once there is something to chart
+    import plotly.graph_objects as go
 
-    # For display order, reverse so largest on top (optional)
-    alert_df = alert_df.sort_values("Alert Count", ascending=False)
-
-    # Build horizontal stacked bar chart with px (colors set)
-    fig = px.bar(
-        alert_df,
-        y="Alert Activity",
-        x=["Rectified Count", "Alert Balance"],
-        orientation="h",
-        text_auto=True,
-        barmode="stack",
-        labels={"value":"Count", "Alert Activity":"Alert Activity"},
-        color_discrete_map={"Rectified Count":"green", "Alert Balance":"red"}
-    )
-    fig.update_layout(
-        title="Alert Status Overview (Rectified vs Pending)",
-        xaxis_title="Count",
-        yaxis_title="Alert Activity",
-        legend_title="Status",
-        height=500,
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(go.Figure(alerts_figure(st.session_state.alerts[ALERT_CHART_COLUMNS])), use_container_width=True)
 else:
     st.info("No alerts added yet.")
 
 # ----------------- SAVE & DOWNLOAD POD -----------------
 st.subheader("💾 Save & Download POD + EOD Data")
-if st.button("Prepare POD for Download"):
-    date_str = selected_date.strftime("%d-%m-%Y")
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        st.session_state.manpower.to_excel(writer, sheet_name="Manpower", index=False)
-        st.session_state.activities.to_excel(writer, sheet_name="Activities", index=False)
-        st.session_state.alerts.to_excel(writer, sheet_name="Alerts", index=False)
-        st.session_state.eod.to_excel(writer, sheet_name="EOD", index=False)
-    output.seek(0)
-    st.download_button(
-        label=f"📥 Download POD_{date_str}.xlsx",
-        data=output,
-        file_name=f"POD_{date_str}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    st.success("✅ POD file ready for download!")
+if "dl_executor" not in st.session_state:
+    st.session_state.dl_executor = ThreadPoolExecutor(max_workers=1)
+
+prepare_clicked = st.button("Prepare POD for Download")
+dl_future = None
+# only sessions with a build to check or a click to serve pay for hashing the four frames
+if prepare_clicked or "dl_future" in st.session_state:
+    dl_file_name = f"POD_{selected_date.strftime('%d-%m-%Y')}.xlsx"
+    sheets = {
+        "Manpower": st.session_state.manpower,
+        "Activities": st.session_state.activities,
+        "Alerts": st.session_state.alerts,
+        "EOD": st.session_state.eod,
+    }
+    # decides both whether a click can reuse the last build and whether that build may be shown
+    dl_signature = (dl_file_name, *(_df_hash(df) for df in sheets.values()))
+    if st.session_state.get("dl_signature") != dl_signature:
+        # data or date changed since the last build: its bytes are stale, so forget it
+        st.session_state.pop("dl_future", None)
+        st.session_state.pop("dl_signature", None)
+
+    dl_future = st.session_state.get("dl_future")
+    # nothing changed since the last build: keep serving its bytes instead of serializing again
+    if prepare_clicked and (dl_future is None or (dl_future.done() and dl_future.exception())):
+        st.session_state.dl_signature = dl_signature
+        # snapshot the frames: the Add handlers append to them in place
+        dl_future = st.session_state.dl_future = st.session_state.dl_executor.submit(
+            build_download_bytes, {name: df.copy() for name, df in sheets.items()}
+        )
+
+if dl_future is not None and dl_future.done():
+    if dl_future.exception() is not None:
+        st.error(f"❌ Could not build the POD file: {dl_future.exception()}")
+    else:
+        st.download_button(
+            label=f"📥 Download {dl_file_name}",
+            data=dl_future.result(),
+            file_name=dl_file_name,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        st.success("✅ POD file ready for download!")
+elif dl_future is not None:
+    wait_for_download()
 
 # ----------------- FOOTER -----------------
-st.markdown(
-    "<div style='text-align:center;color:gray;'>⚡ Designed by Acciona for Solar Plant Daily Operations</div>",
-    unsafe_allow_html=True
-)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)